@@ -0,0 +1,39 @@
+"""create users table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("login", sa.String(), nullable=False),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("mexc_api_key", sa.String(), nullable=False),
+        sa.Column("mexc_api_secret", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"], unique=False)
+    op.create_index("ix_users_login", "users", ["login"], unique=True)
+    op.create_index("ix_users_mexc_api_key", "users", ["mexc_api_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_mexc_api_key", table_name="users")
+    op.drop_index("ix_users_login", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,94 @@
+"""bcrypt password hashes and covering login index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+import logging
+
+from alembic import context, op
+import sqlalchemy as sa
+from passlib.context import CryptContext
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# bcrypt учитывает только первые 72 байта пароля и не принимает NUL (как auth.BCRYPT_MAX_PASSWORD_BYTES)
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+users = sa.table(
+    "users",
+    sa.column("id", sa.Integer),
+    sa.column("password", sa.String),
+)
+
+
+def _hash_legacy_passwords() -> None:
+    pwd_ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12)
+    conn = op.get_bind()
+    legacy = [
+        (user_id, password)
+        for user_id, password in conn.execute(sa.select(users.c.id, users.c.password)).all()
+        if pwd_ctx.identify(password) is None
+    ]
+    # Такие пароли bcrypt молча обрезал бы (или не принял), и подошел бы любой пароль с тем же началом.
+    # Не меняем ничего, пока оператор не разберется с ними вручную
+    unhashable = [
+        user_id for user_id, password in legacy
+        if len(password.encode("utf-8")) > BCRYPT_MAX_PASSWORD_BYTES or "\x00" in password
+    ]
+    if unhashable:
+        raise RuntimeError(
+            f"0002: users {unhashable} have plaintext passwords longer than {BCRYPT_MAX_PASSWORD_BYTES} bytes "
+            "or containing NUL, which bcrypt cannot store without truncation; reset their passwords and rerun"
+        )
+    for user_id, password in legacy:
+        conn.execute(
+            users.update().where(users.c.id == user_id).values(password=pwd_ctx.hash(password))
+        )
+
+
+def upgrade() -> None:
+    # До перехода на bcrypt пароли хранились открытым текстом: хешируем их,
+    # иначе такие строки не поместятся в varchar(60)
+    if context.is_offline_mode():
+        # В режиме --sql строки прочитать нельзя, а bcrypt считается в Python
+        message = (
+            "0002: legacy plaintext passwords are NOT hashed in offline mode; "
+            "run this revision online if the users table has rows from before bcrypt"
+        )
+        logger.warning(message)
+        op.execute(f"-- WARNING: {message}")
+    else:
+        _hash_legacy_passwords()
+
+    op.alter_column(
+        "users", "password",
+        type_=sa.String(length=60),
+        existing_type=sa.String(),
+        existing_nullable=False
+    )
+    op.create_index(
+        "ix_users_login_covering", "users", ["login"],
+        unique=True,
+        postgresql_include=["password", "mexc_api_key", "mexc_api_secret"],
+    )
+
+
+def downgrade() -> None:
+    # Хеши паролей остаются хешами: восстановить открытый текст невозможно
+    op.drop_index("ix_users_login_covering", table_name="users")
+    op.alter_column(
+        "users", "password",
+        type_=sa.String(),
+        existing_type=sa.String(length=60),
+        existing_nullable=False
+    )
@@ -0,0 +1,25 @@
+"""drop redundant ix_users_login
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Уникальность логина уже обеспечивает ix_users_login_covering
+    op.drop_index("ix_users_login", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index("ix_users_login", "users", ["login"], unique=True)
@@ -0,0 +1,38 @@
+"""bounded varchar widths for users columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = {
+    "login": 50,
+    "mexc_api_key": 128,
+    "mexc_api_secret": 128,
+}
+
+
+def upgrade() -> None:
+    for column, length in _COLUMNS.items():
+        op.alter_column("users", column, type_=sa.String(length=length), existing_nullable=False)
+
+
+def downgrade() -> None:
+    for column, length in _COLUMNS.items():
+        op.alter_column(
+            "users", column,
+            type_=sa.String(),
+            existing_type=sa.String(length=length),
+            existing_nullable=False
+        )
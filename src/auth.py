@@ -1,14 +1,38 @@
+import hashlib
+import hmac
+import json
 import os
+import secrets
+from cachetools import TTLCache
+from dataclasses import asdict, dataclass
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import Annotated
 
-from database.database import get_db
+from database.database import get_db, redis_client
 from database.models import User
 
+# bcrypt: хеш фиксированной длины (60 символов), проверка в постоянное время.
+# rounds - стоимость хеширования, увеличивается вместе с мощностью железа
+pwd_ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12)
+# bcrypt учитывает только первые 72 байта пароля, остальное молча отбрасывается
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Время жизни записи пользователя в Redis, секунды
+USER_CACHE_TTL = 300
+
+# Недавние успешные логины этого процесса: login -> (дайджест пароля, ответ).
+# Повторный вход в течение TTL не платит за bcrypt; неверный пароль всегда идет через bcrypt
+_login_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+# Ключ blake2b живет только в памяти процесса, чтобы дайджесты нельзя было перебрать офлайн
+_LOGIN_CACHE_KEY = secrets.token_bytes(32)
+
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
@@ -17,46 +41,155 @@ router = APIRouter(
 class UserCreateSchema(BaseModel):
     login: str = Field(..., min_length=3, max_length=50, description="Придумайте логин для терминала")
     password: str = Field(..., min_length=6, description="Придумайте пароль для терминала (минимум 6 символов)")
-    mexc_api_key: str = Field(..., description="Ваш API Key от биржи MEXC")
-    mexc_api_secret: str = Field(..., description="Ваш API Secret от биржи MEXC")
+    mexc_api_key: str = Field(..., max_length=128, description="Ваш API Key от биржи MEXC")
+    mexc_api_secret: str = Field(..., max_length=128, description="Ваш API Secret от биржи MEXC")
+
+    @field_validator("password")
+    @classmethod
+    def password_fits_bcrypt(cls, value: str) -> str:
+        if len(value.encode("utf-8")) > BCRYPT_MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be at most {BCRYPT_MAX_PASSWORD_BYTES} bytes in UTF-8")
+        # bcrypt не принимает NUL-байт: passlib бросает PasswordValueError и регистрация падает с 500
+        if "\x00" in value:
+            raise ValueError("Password must not contain NUL characters")
+        return value
 
 
 class UserApiKeysSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     mexc_api_key: str
     mexc_api_secret: str
 
-    class Config:
-        from_attributes = True
-
 
 class LoginResponseSchema(BaseModel):
     login: str
     api_keys: UserApiKeysSchema
 
 
-async def get_user_by_login(db: AsyncSession, login: str) -> User | None:
-    result = await db.execute(select(User).filter(User.login == login))
-    return result.scalar_one_or_none()
+@dataclass(slots=True)
+class CachedUser:
+    """Легкая копия строки users для кеша, без ORM-объекта."""
+    login: str
+    password: str
+    mexc_api_key: str
+    mexc_api_secret: str
 
 
-async def create_db_user(db: AsyncSession, user_data: UserCreateSchema) -> User:
-    db_user = User(
-        login=user_data.login,
-        password=user_data.password,  # Пароль для нашего сервиса
-        mexc_api_key=user_data.mexc_api_key,
-        mexc_api_secret=user_data.mexc_api_secret  # API биржи
+# Запрос строится один раз при импорте, на каждый вызов подставляется только параметр.
+# Берем только нужные колонки: без гидрации ORM-объекта, index-only scan по ix_users_login_covering
+_SELECT_USER_BY_LOGIN = (
+    select(User.password, User.mexc_api_key, User.mexc_api_secret)
+    .where(User.login == bindparam("login"))
+)
+
+
+def _user_cache_key(login: str) -> str:
+    return f"user:{login}"
+
+
+async def get_user_by_login(db: AsyncSession, login: str) -> CachedUser | None:
+    key = _user_cache_key(login)
+    # Недоступность Redis не должна ломать авторизацию - просто идем в БД
+    try:
+        cached = await redis_client.get(key)
+    except RedisError:
+        cached = None
+    if cached is not None:
+        try:
+            return CachedUser(**json.loads(cached))
+        except (ValueError, TypeError):
+            # Поврежденная или устаревшая по формату запись - считаем промахом кеша
+            try:
+                await redis_client.delete(key)
+            except RedisError:
+                pass
+
+    result = await db.execute(_SELECT_USER_BY_LOGIN, {"login": login})
+    row = result.first()
+    if row is None:
+        return None
+
+    cached_user = CachedUser(
+        login=login,
+        password=row.password,
+        mexc_api_key=row.mexc_api_key,
+        mexc_api_secret=row.mexc_api_secret
     )
-    db.add(db_user)
     try:
-        await db.commit()
-        await db.refresh(db_user)
-    except IntegrityError:  # Обработка случая, если логин для нашего сервиса уже существует
+        await redis_client.setex(key, USER_CACHE_TTL, json.dumps(asdict(cached_user)))
+    except RedisError:
+        pass
+    return cached_user
+
+
+def _password_digest(password: str) -> bytes:
+    return hashlib.blake2b(password.encode("utf-8"), digest_size=16, key=_LOGIN_CACHE_KEY).digest()
+
+
+def is_legacy_password(stored_password: str) -> bool:
+    # Строки, сохраненные до перехода на bcrypt, содержат открытый пароль
+    return pwd_ctx.identify(stored_password) is None
+
+
+def verify_password(plain_password: str, hashed_password: str | None) -> bool:
+    if hashed_password is None:
+        # Прогоняем bcrypt вхолостую, чтобы по времени ответа нельзя было понять, существует ли логин
+        pwd_ctx.dummy_verify()
+        return False
+    if is_legacy_password(hashed_password):
+        return hmac.compare_digest(hashed_password.encode("utf-8"), plain_password.encode("utf-8"))
+    try:
+        return pwd_ctx.verify(plain_password, hashed_password)
+    except ValueError:  # Поврежденный хеш в БД
+        return False
+
+
+async def upgrade_legacy_password(db: AsyncSession, login: str, plain_password: str) -> None:
+    """Заменяет открытый пароль пользователя на bcrypt-хеш после успешного входа."""
+    hashed_password = await run_in_threadpool(pwd_ctx.hash, plain_password)
+    await db.execute(update(User).where(User.login == login).values(password=hashed_password))
+    await db.commit()
+    try:
+        await redis_client.delete(_user_cache_key(login))
+    except RedisError:
+        pass
+
+
+async def create_db_user(db: AsyncSession, user_data: UserCreateSchema) -> CachedUser:
+    # bcrypt нагружает CPU, поэтому не блокируем event loop
+    hashed_password = await run_in_threadpool(pwd_ctx.hash, user_data.password)
+    # Один INSERT ... ON CONFLICT вместо предварительного SELECT: занятый логин дает пустой RETURNING
+    stmt = (
+        pg_insert(User)
+        .values(
+            login=user_data.login,
+            password=hashed_password,  # Хеш пароля для нашего сервиса
+            mexc_api_key=user_data.mexc_api_key,
+            mexc_api_secret=user_data.mexc_api_secret  # API биржи
+        )
+        .on_conflict_do_nothing(index_elements=["login"])
+        .returning(User.id)  # Остальные поля известны из запроса, ORM-объект не нужен
+    )
+    user_id = (await db.execute(stmt)).scalar_one_or_none()
+    if user_id is None:  # Обработка случая, если логин для нашего сервиса уже существует
         await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Login for the service already registered."
+            detail="This login is already taken for the terminal."
         )
-    return db_user
+    await db.commit()
+    _login_cache.pop(user_data.login, None)
+    try:
+        await redis_client.delete(_user_cache_key(user_data.login))
+    except RedisError:
+        pass
+    return CachedUser(
+        login=user_data.login,
+        password=hashed_password,
+        mexc_api_key=user_data.mexc_api_key,
+        mexc_api_secret=user_data.mexc_api_secret
+    )
 
 
 # --- Эндпоинты ---
@@ -72,13 +205,6 @@ async def register_user(user_data: UserCreateSchema, db: AsyncSession = Depends(
     - mexc_api_secret API Secret от биржи MEXC.
     Возвращает логин пользователя и его API ключи для немедленного использования.
     """
-    existing_user = await get_user_by_login(db, login=user_data.login)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="This login is already taken for the terminal."
-        )
-
     # Тут можно добавить проверку на уникальность пары mexc_api_key, если это важно,
     # но обычно один API ключ может использоваться только одним пользователем системы.
     # Однако, если разные пользователи системы могут случайно ввести один и тот же API ключ,
@@ -106,15 +232,29 @@ async def login_user(
     Принимает `login` и `password` (для терминала) в виде form-data.
     Возвращает логин пользователя и его привязанные MEXC API ключи.
     """
+    digest = _password_digest(password)
+    cached = _login_cache.get(login)
+    if cached is not None and hmac.compare_digest(cached[0], digest):
+        return cached[1]
+
     user = await get_user_by_login(db, login=login)
 
     # Проверяем, что пользователь существует и пароль для нашего сервиса совпадает
-    if not user or not (user.password == password):
+    pw_ok = await run_in_threadpool(verify_password, password, user.password if user else None)
+    if not user or not pw_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect terminal login or password",
         )
 
+    # Длинные пароли и пароли с NUL не перехешируем: bcrypt обрезал бы их до 72 байт или не принял бы
+    if (
+        is_legacy_password(user.password)
+        and len(password.encode("utf-8")) <= BCRYPT_MAX_PASSWORD_BYTES
+        and "\x00" not in password
+    ):
+        await upgrade_legacy_password(db, login, password)
+
     # Проверяем, что у пользователя есть привязанные ключи
     if not user.mexc_api_key or not user.mexc_api_secret:
         raise HTTPException(
@@ -122,10 +262,12 @@ async def login_user(
             detail="MEXC API keys not found for this user. Please register them or contact support.",
         )
 
-    return LoginResponseSchema(
+    response = LoginResponseSchema(
         login=user.login,
         api_keys=UserApiKeysSchema(
             mexc_api_key=user.mexc_api_key,
             mexc_api_secret=user.mexc_api_secret
         )
-    )
\ No newline at end of file
+    )
+    _login_cache[login] = (digest, response)
+    return response
\ No newline at end of file
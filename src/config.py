@@ -0,0 +1,58 @@
+import logging
+from pathlib import Path
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# .env лежит в корне проекта, на уровень выше src/
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+
+class Settings(BaseSettings):
+    """Настройки сервиса: переменные окружения и .env читаются один раз при импорте."""
+    # env_ignore_empty: пустая переменная (например, DEV=) означает значение по умолчанию
+    model_config = SettingsConfigDict(env_file=ENV_FILE, env_ignore_empty=True, extra="ignore", frozen=True)
+
+    db_user: str = "user_kursovaya"
+    db_password: str = "1234"
+    db_host: str = "localhost"
+    db_port: int = 5432
+    db_name: str = "bd_for_test_kursovoy"
+    # Пул создается в каждом воркере: workers * (db_pool_size + db_max_overflow)
+    # должно укладываться в max_connections сервера Postgres (db_max_connections)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_max_connections: int = 100
+
+    redis_url: str = "redis://localhost:6379/0"
+    # Таймаут операций с Redis, секунды: зависший Redis не должен блокировать логин
+    redis_timeout: float = 0.5
+
+    # Версия клиента, с которой будет сверяться приложение пользователя
+    expected_client_version: str = "1.0.3"
+    # Версия самого API сервера (может быть другой)
+    api_service_version: str = "1.2.5"
+
+    log_level: str = "INFO"
+    auto_create_tables: bool = False
+    dev: bool = False
+    # Количество процессов uvicorn при запуске через python main.py
+    workers: int = 2
+
+    @field_validator("log_level")
+    @classmethod
+    def normalize_log_level(cls, value: str) -> str:
+        level = value.strip().upper()
+        if level not in logging.getLevelNamesMapping():
+            raise ValueError(f"Unknown log level: {value!r}")
+        return level
+
+    @property
+    def database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{self.db_password}"
+            f"@{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
+
+settings = Settings()
@@ -1,22 +1,45 @@
-import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+from typing import AsyncGenerator
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-DB_USER = os.environ.get("DB_USER", "user_kursovaya")
-DB_PASSWORD = os.environ.get("DB_PASSWORD", "1234")
-DB_HOST = os.environ.get("DB_HOST", "localhost")
-DB_PORT = os.environ.get("DB_PORT", "5432")
-DB_NAME = os.environ.get("DB_NAME", "bd_for_test_kursovoy")
+from config import settings
 
-URL_DATABASE = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+logger = logging.getLogger(__name__)
 
-print(f"Connecting to database: {DB_HOST}:{DB_PORT}/{DB_NAME} as {DB_USER}")
+URL_DATABASE = settings.database_url
 
-engine = create_async_engine(URL_DATABASE, echo=False)
-SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-Base = declarative_base()
+logger.info(
+    "Connecting to database: %s:%s/%s as %s",
+    settings.db_host, settings.db_port, settings.db_name, settings.db_user
+)
 
+engine = create_async_engine(
+    URL_DATABASE,
+    echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,  # Отбрасываем соединения, которые БД успела закрыть
+    pool_recycle=1800
+)
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
-async def get_db():
+
+class Base(DeclarativeBase):
+    pass
+
+
+# Кеш пользователей перед PostgreSQL (см. auth.get_user_by_login)
+redis_client = Redis.from_url(
+    settings.redis_url,
+    socket_connect_timeout=settings.redis_timeout,
+    socket_timeout=settings.redis_timeout
+)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
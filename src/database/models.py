@@ -1,16 +1,26 @@
-from sqlalchemy import Column, Integer, String, Sequence
+from sqlalchemy import Index, String
+from sqlalchemy.orm import Mapped, mapped_column
 from .database import Base  # Импортируем Base из нашего database.py
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Покрывающий индекс под auth.get_user_by_login: Postgres отдает строку без чтения таблицы.
+        # Он же обеспечивает уникальность логина и служит arbiter-индексом для ON CONFLICT (login)
+        Index(
+            "ix_users_login_covering", "login",
+            unique=True,
+            postgresql_include=["password", "mexc_api_key", "mexc_api_secret"]
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
 
-    login = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String, nullable=False)
-    mexc_api_key = Column(String, nullable=False, index=True)
-    mexc_api_secret = Column(String, nullable=False)
+    login: Mapped[str] = mapped_column(String(50))
+    password: Mapped[str] = mapped_column(String(60))  # bcrypt-хеш
+    mexc_api_key: Mapped[str] = mapped_column(String(128), index=True)
+    mexc_api_secret: Mapped[str] = mapped_column(String(128))
 
     def __repr__(self):
         return f"<User(id={self.id}, login='{self.login}')>"
\ No newline at end of file
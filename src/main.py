@@ -1,40 +1,89 @@
 # main.py (FastAPI сервер)
-from fastapi import FastAPI, HTTPException, status, Body
+from fastapi import FastAPI, HTTPException, status, Body, Header, Response
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
-import os
+import asyncio
+import hashlib
+import logging
+import orjson
 from pydantic import BaseModel, Field  # Для модели запроса версии
+from typing import Annotated
+from sqlalchemy import text
 
-# Загружаем переменные окружения из .env файла (если он есть)
-# Это должно быть сделано до того, как SERVICE_VERSION пытается получить значение из os.environ,
-# если SERVICE_VERSION тоже должен быть в .env
-load_dotenv()
+from config import settings
 
 # Версия сервиса (эталонная, с которой будет сверяться клиент)
-# Может быть жестко задана здесь или также браться из .env
-SERVER_EXPECTED_CLIENT_VERSION = os.environ.get("EXPECTED_CLIENT_VERSION", "1.0.3")  # Пример версии клиента
+SERVER_EXPECTED_CLIENT_VERSION = settings.expected_client_version
 # Версия самого API сервера (может быть другой)
-API_SERVICE_VERSION = os.environ.get("API_SERVICE_VERSION", "1.2.5")
+API_SERVICE_VERSION = settings.api_service_version
 
-# Импорты после load_dotenv, если они зависят от переменных окружения
-from database.database import engine, Base
+logging.basicConfig(
+    level=settings.log_level,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Ответы /sec/* зависят только от переменных окружения, поэтому сериализуем их один раз при импорте
+_VERSION_OK_BODY = orjson.dumps({
+    "status": "ok",
+    "message": "Client version is up to date.",
+    "server_api_version": API_SERVICE_VERSION
+})
+_VERSION_OK_ETAG = f'"{hashlib.sha1(_VERSION_OK_BODY).hexdigest()}"'
+_INFO_BODY = orjson.dumps({
+    "service_name": "Crypto Terminal Auth Service",
+    "api_version": API_SERVICE_VERSION,
+    "expected_client_version": SERVER_EXPECTED_CLIENT_VERSION
+})
+_INFO_ETAG = f'"{hashlib.sha1(_INFO_BODY).hexdigest()}"'
+# GET /sec/info могут кешировать reverse-proxy (nginx/cloudflare). Ответ POST /sec/check_version
+# зависит от тела запроса, которое не входит в ключ кеша прокси, поэтому его не кешируем
+_INFO_CACHE_CONTROL = "public, max-age=300"
+_VERSION_CACHE_CONTROL = "no-store"
+
+# Импорты после basicConfig, чтобы логи при импорте шли через общую настройку
+from database.database import engine, Base, redis_client
 from auth import router as auth_router
 
 
+async def warm_up_pool():
+    # Открываем все соединения пула одновременно, чтобы первые запросы
+    # не платили за установку соединения с БД
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.db_pool_size)),
+        return_exceptions=True
+    )
+    conns = [r for r in results if not isinstance(r, BaseException)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    try:
+        if not errors:
+            await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+    finally:
+        # Возвращаем в пул все открытые соединения, даже если часть не удалось открыть
+        await asyncio.gather(*(conn.close() for conn in conns), return_exceptions=True)
+    if errors:
+        raise errors[0]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print(f"API Service Version: {API_SERVICE_VERSION}")
-    print(f"Expected Client Version by Server: {SERVER_EXPECTED_CLIENT_VERSION}")
-    print("Starting up FastAPI application...")
-    async with engine.begin() as conn:
-        # В реальном production лучше использовать Alembic для миграций
-        await conn.run_sync(Base.metadata.create_all)
-        print("Database tables checked/created.")
+    logger.info("API Service Version: %s", API_SERVICE_VERSION)
+    logger.info("Expected Client Version by Server: %s", SERVER_EXPECTED_CLIENT_VERSION)
+    logger.info("Starting up FastAPI application...")
+    # Схемой в production управляет Alembic (alembic upgrade head); create_all - только для локального запуска
+    if settings.auto_create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            logger.info("Database tables checked/created.")
+    await warm_up_pool()
+    logger.info("Database pool warmed up (%d connections).", settings.db_pool_size)
     yield
-    print("Shutting down FastAPI application...")
+    logger.info("Shutting down FastAPI application...")
     if engine:  # Проверяем, что engine не None перед dispose
         await engine.dispose()
-        print("Database engine disposed.")
+        logger.info("Database engine disposed.")
+    await redis_client.aclose()
+    logger.info("Redis client closed.")
 
 
 # --- Pydantic модель для запроса проверки версии ---
@@ -46,28 +95,48 @@ app = FastAPI(
     title="Crypto Terminal Authentication Service",
     description="Сервис авторизации и регистрации для курсового проекта.",
     version=API_SERVICE_VERSION,  # Версия самого API сервера
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Сериализация ответов через orjson вместо stdlib json
 )
 
 # Подключаем роутер аутентификации
 app.include_router(auth_router)
 
 
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    # If-None-Match: "*" или список тегов через запятую; сравнение слабое (RFC 9110),
+    # т.к. nginx при gzip превращает ETag в W/"..."
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _static_json_response(body: bytes, etag: str, cache_control: str, if_none_match: str | None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    # Клиент уже имеет актуальную версию ответа - отдаем 304 без тела
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 @app.post("/sec/check_version", tags=["Service Info"])
-async def check_client_version(version_info: ClientVersionInfo):
+async def check_client_version(
+        version_info: ClientVersionInfo,
+        if_none_match: Annotated[str | None, Header()] = None
+):
     """
     Принимает версию клиентского приложения и сверяет ее с ожидаемой на сервере.
     - Если версии совпадают, возвращает подтверждение.
     - Если версии не совпадают, возвращает ошибку 426 Upgrade Required.
       (Клиент должен будет обработать этот статус и, например, закрыться или предложить обновление).
     """
-    print(f"Received client version check: {version_info.client_version}")
+    logger.debug("Received client version check: %s", version_info.client_version)
     if version_info.client_version == SERVER_EXPECTED_CLIENT_VERSION:
-        return {
-            "status": "ok",
-            "message": "Client version is up to date.",
-            "server_api_version": API_SERVICE_VERSION
-        }
+        return _static_json_response(_VERSION_OK_BODY, _VERSION_OK_ETAG, _VERSION_CACHE_CONTROL, if_none_match)
     else:
         # Статус 426 Upgrade Required - подходящий для этого случая
         raise HTTPException(
@@ -77,20 +146,33 @@ async def check_client_version(version_info: ClientVersionInfo):
 
 
 @app.get("/sec/info", tags=["Service Info"])  # Оставим GET для получения информации о сервере, если нужно
-async def get_server_info():
+async def get_server_info(if_none_match: Annotated[str | None, Header()] = None):
     """
     Возвращает информацию о сервере, включая версию API и ожидаемую версию клиента.
     """
-    return {
-        "service_name": "Crypto Terminal Auth Service",
-        "api_version": API_SERVICE_VERSION,
-        "expected_client_version": SERVER_EXPECTED_CLIENT_VERSION
-    }
+    return _static_json_response(_INFO_BODY, _INFO_ETAG, _INFO_CACHE_CONTROL, if_none_match)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    # Uvicorn будет читать .env файл, если он в той же директории,
-    # или если python-dotenv вызван до инициализации uvicorn (что мы и делаем)
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)  # Добавил reload=True для удобства разработки
+    # .env читается при импорте config.settings
+    if settings.dev:
+        uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)  # reload=True для удобства разработки
+    else:
+        max_db_connections = settings.workers * (settings.db_pool_size + settings.db_max_overflow)
+        if max_db_connections > settings.db_max_connections:
+            raise SystemExit(
+                f"WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) = {max_db_connections} exceeds "
+                f"DB_MAX_CONNECTIONS = {settings.db_max_connections}; lower the workers or pool size."
+            )
+        # auto выбирает uvloop и httptools (event loop и HTTP-парсер на Cython), если они установлены;
+        # на Windows uvloop нет, и uvicorn откатывается на стандартный asyncio
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="auto",
+            http="auto",
+            workers=settings.workers
+        )
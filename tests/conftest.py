@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+# Сервис запускается из src/ (см. Dockerfile), тесты импортируют модули так же
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import auth  # noqa: E402
+from database.database import get_db  # noqa: E402
+from main import app  # noqa: E402
+
+
+class FakeRedis:
+    """Redis в памяти: только методы, которые использует auth."""
+
+    def __init__(self):
+        self.data = {}
+        self.deleted = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.deleted.append(key)
+        self.data.pop(key, None)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class FakeSession:
+    """Сессия БД, отдающая заранее заданную строку users и запоминающая выполненные запросы."""
+
+    def __init__(self):
+        self.row = None
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt)
+        return FakeResult(self.row)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def fast_pwd_ctx(monkeypatch):
+    # Минимальная стоимость bcrypt, чтобы тесты не тратили секунды на хеширование
+    ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    monkeypatch.setattr(auth, "pwd_ctx", ctx)
+    return ctx
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(auth, "redis_client", redis)
+    return redis
+
+
+@pytest.fixture
+def db_session():
+    session = FakeSession()
+    app.dependency_overrides[get_db] = lambda: session
+    yield session
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def client(fast_pwd_ctx, fake_redis, db_session):
+    auth._login_cache.clear()
+    # Без with: lifespan (подключение к БД) в тестах не запускается
+    yield TestClient(app)
+    auth._login_cache.clear()
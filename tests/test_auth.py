@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+from sqlalchemy.sql.dml import Update
+
+import auth
+
+
+def _user_row(password):
+    return SimpleNamespace(password=password, mexc_api_key="key", mexc_api_secret="secret")
+
+
+def _login(client, password, login="alice"):
+    return client.post("/auth/login", data={"login": login, "password": password})
+
+
+def _spy_verify_password(monkeypatch):
+    calls = []
+    original = auth.verify_password
+
+    def spy(plain_password, hashed_password):
+        calls.append(plain_password)
+        return original(plain_password, hashed_password)
+
+    monkeypatch.setattr(auth, "verify_password", spy)
+    return calls
+
+
+def test_repeat_login_is_served_from_login_cache(client, db_session, fast_pwd_ctx, monkeypatch):
+    db_session.row = _user_row(fast_pwd_ctx.hash("secret123"))
+    first = _login(client, "secret123")
+    assert first.status_code == 200
+
+    verify_calls = _spy_verify_password(monkeypatch)
+    statements_before = len(db_session.statements)
+    second = _login(client, "secret123")
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert verify_calls == []
+    assert len(db_session.statements) == statements_before
+
+
+def test_wrong_password_for_cached_login_goes_through_bcrypt(client, db_session, fast_pwd_ctx, monkeypatch):
+    db_session.row = _user_row(fast_pwd_ctx.hash("secret123"))
+    assert _login(client, "secret123").status_code == 200
+
+    verify_calls = _spy_verify_password(monkeypatch)
+    response = _login(client, "wrong-password")
+
+    assert response.status_code == 401
+    assert verify_calls == ["wrong-password"]
+
+
+def test_legacy_plaintext_password_is_rehashed_on_login(client, db_session, fake_redis, fast_pwd_ctx):
+    db_session.row = _user_row("secret123")
+
+    response = _login(client, "secret123")
+
+    assert response.status_code == 200
+    updates = [stmt for stmt in db_session.statements if isinstance(stmt, Update)]
+    assert len(updates) == 1
+    new_hash = updates[0].compile().params["password"]
+    assert fast_pwd_ctx.identify(new_hash) == "bcrypt"
+    assert fast_pwd_ctx.verify("secret123", new_hash)
+    assert db_session.commits == 1
+    assert "user:alice" in fake_redis.deleted
+
+
+def test_legacy_plaintext_wrong_password_is_rejected(client, db_session):
+    db_session.row = _user_row("secret123")
+
+    response = _login(client, "secret124")
+
+    assert response.status_code == 401
+    assert not any(isinstance(stmt, Update) for stmt in db_session.statements)
+
+
+def test_register_rejects_password_with_nul(client, db_session):
+    response = client.post("/auth/register", json={
+        "login": "alice",
+        "password": "abc\u0000def",
+        "mexc_api_key": "key",
+        "mexc_api_secret": "secret",
+    })
+
+    assert response.status_code == 422
+    assert db_session.statements == []
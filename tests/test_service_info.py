@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ('"other"', False),
+    ("*", True),
+    ('"etag"', True),
+    ('W/"etag"', True),
+    ('"other", W/"etag"', True),
+    ('"other",   "etag"', True),
+])
+def test_etag_matches(if_none_match, expected):
+    assert main._etag_matches('"etag"', if_none_match) is expected
+
+
+def test_info_returns_304_for_weak_etag():
+    client = TestClient(main.app)
+    etag = client.get("/sec/info").headers["etag"]
+
+    response = client.get("/sec/info", headers={"If-None-Match": f'"other", W/{etag}'})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=300"
+
+
+def test_check_version_is_not_publicly_cacheable():
+    client = TestClient(main.app)
+
+    response = client.post("/sec/check_version", json={"client_version": main.SERVER_EXPECTED_CLIENT_VERSION})
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"